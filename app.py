@@ -1,7 +1,14 @@
 import random
 import os
 import itertools # Necesario para combinaciones de cartas
+import threading
+import uuid
 from flask import Flask, render_template, request, redirect, url_for, session
+# Las rutas no usan el evaluador por lotes (evaluador.py, que depende de NumPy), así que app no
+# lo importa: solo lo cargan las herramientas que lo necesitan, y el arranque no paga su coste.
+# benchmark_arranque.py comprueba este presupuesto de arranque.
+from perfiles import AlmacenPerfiles
+from estadisticas import EstadisticasJugador
 
 # --- Constantes del Juego ---
 FICHAS_INICIALES = 1000
@@ -137,17 +144,29 @@ class CPU(Jugador):
     def __init__(self, nombre, fichas_iniciales):
         super().__init__(nombre, fichas_iniciales)
         self.es_cpu = True
+        self.estadisticas_oponente = None # EstadisticasJugador del rival, si se conoce
 
-    def decidir_accion(self, apuesta_actual, fichas_en_mesa):
+    def decidir_accion(self, apuesta_actual, fichas_en_mesa, calle=0):
         """
         Decide la acción de la CPU (apostar, igualar, subir, pasar, retirarse, all-in).
         Esta es una IA muy básica y puede ser mejorada.
+        Si conoce las estadísticas del oponente, apuesta más contra jugadores que se retiran
+        a menudo y se retira menos contra jugadores muy agresivos.
         """
         cantidad_a_igualar = apuesta_actual - self.apostado_en_ronda
 
+        prob_pasar = 0.7
+        prob_retirarse = 0.2
+        if self.estadisticas_oponente is not None:
+            rival = self.estadisticas_oponente
+            # Cuanto más se retira el rival ante apuestas, más se apuesta (entre 40% y 90% de pasar)
+            prob_pasar = min(0.9, max(0.4, 0.7 - (rival.retirada_ante_apuesta(calle) - 0.4)))
+            # Contra un rival agresivo sus apuestas valen menos: retirarse menos (entre 5% y 30%)
+            prob_retirarse = min(0.3, max(0.05, 0.2 / rival.factor_agresion()))
+
         # Si no hay apuesta que igualar (o ya ha igualado/está por encima)
         if cantidad_a_igualar <= 0:
-            if random.random() < 0.7: # 70% de pasar
+            if random.random() < prob_pasar: # 70% de pasar (sin estadísticas del rival)
                 return "pasar", 0
             else: # 30% de apostar
                 apuesta = random.randint(MIN_APUESTA, 80)
@@ -163,7 +182,7 @@ class CPU(Jugador):
                     return "retirarse", 0
             else: # Puede igualar
                 r = random.random()
-                if r < 0.6: # 60% de igualar
+                if r < 0.8 - prob_retirarse: # 60% de igualar (sin estadísticas del rival)
                     return "igualar", cantidad_a_igualar
                 elif r < 0.8: # 20% de subir
                     cantidad_subida = random.randint(MIN_APUESTA, 100)
@@ -171,7 +190,7 @@ class CPU(Jugador):
                         return "subir", cantidad_a_igualar + cantidad_subida
                     else: # No puede subir, entonces iguala
                         return "igualar", cantidad_a_igualar
-                else: # 20% de retirarse (conservador)
+                else: # 20% de retirarse (conservador, sin estadísticas del rival)
                     return "retirarse", 0
 
 # --- Clase Mesa ---
@@ -197,12 +216,23 @@ class Mesa:
 # --- Clase PokerGame (Lógica Principal del Juego) ---
 class PokerGame:
     """Gestiona el estado y la lógica principal del juego de póker."""
-    def __init__(self, nombre_jugador):
+    def __init__(self, nombre_jugador, almacen=None):
         self.baraja = Baraja()
         self.mesa = Mesa()
-        self.jugador = Jugador(nombre_jugador, FICHAS_INICIALES)
+        self.almacen = almacen # AlmacenPerfiles opcional para conservar el saldo entre partidas
+        self.sesion = uuid.uuid4().hex # Identifica esta partida en el libro de fichas
+        fichas_jugador = FICHAS_INICIALES
+        if almacen is not None:
+            fichas_jugador = almacen.obtener_perfil(nombre_jugador)['fichas']
+            if fichas_jugador <= 0: # Si se quedó sin fichas, empieza de nuevo con las iniciales
+                fichas_jugador = FICHAS_INICIALES
+                almacen.registrar_recarga(nombre_jugador, self.sesion, fichas_jugador)
+        self.jugador = Jugador(nombre_jugador, fichas_jugador)
         self.maquina = CPU("CPU", FICHAS_INICIALES)
         self.jugadores_en_juego = [self.jugador, self.maquina] # Orden de turnos
+        # Modelo del jugador humano que consulta la CPU; se conserva entre rondas
+        self.estadisticas_jugador = EstadisticasJugador()
+        self.maquina.estadisticas_oponente = self.estadisticas_jugador
         self.apuesta_actual_ronda = 0 # La apuesta más alta que se ha hecho en la ronda actual
         self.turno_actual_index = 0 # Índice del jugador al que le toca el turno
         self.ronda_de_apuestas_actual = 0 # 0=Pre-flop, 1=Flop, 2=Turn, 3=River, 4=Showdown
@@ -210,6 +240,9 @@ class PokerGame:
         self.mensaje_ronda = "" # Mensajes generales para el usuario
         self.mensaje_error = "" # Mensajes de error específicos para el usuario
         self.ultima_accion_cpu = "" # Para mostrar qué hizo la CPU
+        self.ganador_ronda = None # Jugador que se llevó el bote en la última ronda resuelta
+        self.fichas_inicio_ronda = None # Fichas del jugador al empezar la ronda (None si no ha empezado ninguna)
+        self.ronda_resuelta = False # True cuando el bote de la ronda ya se repartió y la mano se registró
 
     def iniciar_ronda(self, semilla=None):
         """Inicia una nueva ronda de póker."""
@@ -217,6 +250,13 @@ class PokerGame:
         self.mensaje_error = ""
         self.ultima_accion_cpu = ""
 
+        # Una ronda abandonada sin resolverse cuenta como perdida (las fichas apostadas se pierden)
+        if self.fichas_inicio_ronda is not None and not self.ronda_resuelta:
+            self._registrar_resultado(None)
+        self.ronda_resuelta = False
+        self.ganador_ronda = None
+        self.fichas_inicio_ronda = self.jugador.fichas
+
         # Reiniciar baraja, mesa y manos de los jugadores
         self.baraja = Baraja()
         self.mesa.reset_mesa()
@@ -227,6 +267,7 @@ class PokerGame:
         self.turno_actual_index = 0 # El turno siempre empieza con el primer jugador en la lista
         self.ronda_de_apuestas_actual = 0 # Resetea a Pre-flop
         self.baraja.mezclar(semilla)
+        self.estadisticas_jugador.iniciar_mano()
 
         # Repartir 2 cartas a cada jugador
         for _ in range(2):
@@ -256,6 +297,7 @@ class PokerGame:
             self.baraja.repartir_carta() # Quema una carta
             for _ in range(3): # Reparte 3 cartas comunitarias
                 self.mesa.añadir_carta_comunitaria(self.baraja.repartir_carta())
+            self.estadisticas_jugador.registrar_flop()
             self.estado_juego = "flop_apuestas"
             self.mensaje_ronda = "Ronda de apuestas: Flop. ¡Se han repartido las 3 primeras cartas comunitarias!"
         elif self.ronda_de_apuestas_actual == 1: # De Flop a Turn
@@ -314,7 +356,8 @@ class PokerGame:
         self.mensaje_error = "" # Limpiar errores anteriores
         self.ultima_accion_cpu = "" # Limpiar la última acción
 
-        accion_cpu, cantidad_cpu = self.maquina.decidir_accion(self.apuesta_actual_ronda, self.mesa.bote)
+        accion_cpu, cantidad_cpu = self.maquina.decidir_accion(self.apuesta_actual_ronda, self.mesa.bote,
+                                                               self.ronda_de_apuestas_actual)
         self.ultima_accion_cpu = accion_cpu # Guardar la acción para mostrarla en el HTML
 
         if accion_cpu == "apostar":
@@ -360,6 +403,9 @@ class PokerGame:
         self.ultima_accion_cpu = "" # Limpiar la última acción
 
         jugador = self.jugador
+        # Situación antes de actuar, para las estadísticas del jugador
+        calle = self.ronda_de_apuestas_actual
+        frente_a_apuesta = self.apuesta_actual_ronda > jugador.apostado_en_ronda
 
         if accion == "apostar":
             if self.apuesta_actual_ronda > 0:
@@ -429,7 +475,8 @@ class PokerGame:
             self.mensaje_error = "Acción inválida. Inténtalo de nuevo."
             return False
 
-        # Si la acción fue exitosa, avanza al siguiente turno y verifica el fin de la ronda
+        # Si la acción fue exitosa, actualiza las estadísticas, avanza al siguiente turno y verifica el fin de la ronda
+        self.estadisticas_jugador.registrar_accion(calle, accion, frente_a_apuesta)
         self._avanzar_a_siguiente_jugador_activo()
         self._verificar_fin_ronda_apuestas()
 
@@ -441,11 +488,16 @@ class PokerGame:
         Una ronda de apuestas termina si:
         1. Solo queda un jugador activo (gana el bote inmediatamente).
         2. Todos los jugadores activos han igualado la apuesta_actual_ronda (o ido all-in por menos).
+        Si la ronda ya se resolvió, no cambia nada (ej. un formulario reenviado tras terminar).
         """
+        if self.ronda_resuelta:
+            return True
+
         jugadores_activos = [p for p in self.jugadores_en_juego if p.esta_activo]
 
         if len(jugadores_activos) <= 1:
             self.estado_juego = "ronda_terminada_por_retiro"
+            self.determinar_ganador() # El único jugador activo se lleva el bote
             return True
 
         todos_igualados = True
@@ -599,16 +651,24 @@ class PokerGame:
         Si solo queda un jugador activo, ese jugador gana.
         De lo contrario, evalúa las manos de póker completas.
         """
+        if self.ronda_resuelta:
+            return # La ronda ya se resolvió: no repartir el bote ni registrarla dos veces
+
         jugadores_activos = [p for p in self.jugadores_en_juego if p.esta_activo]
 
         if len(jugadores_activos) == 1:
             ganador = jugadores_activos[0]
             self.mensaje_ronda = f"¡Todos los demás jugadores se han retirado! ¡{ganador.nombre} gana el bote de {self.mesa.bote} fichas!"
             ganador.fichas += self.mesa.bote
+            self.ganador_ronda = ganador
             self.mesa.reset_mesa()
             self.estado_juego = "ronda_finalizada" # La ronda ha terminado, se puede iniciar una nueva
+            self.ronda_resuelta = True
+            self._registrar_resultado(ganador)
             return
 
+        self.estadisticas_jugador.registrar_showdown()
+
         # Evaluar las mejores manos de 5 cartas para cada jugador
         player_best_hand_rank = self._get_best_hand(self.jugador.mano, self.mesa.cartas_comunitarias)
         cpu_best_hand_rank = self._get_best_hand(self.maquina.mano, self.mesa.cartas_comunitarias)
@@ -630,8 +690,17 @@ class PokerGame:
 
         self.mensaje_ronda = mensaje_ganador + f"\n¡{ganador.nombre} se lleva el bote de {self.mesa.bote} fichas!"
         ganador.fichas += self.mesa.bote
+        self.ganador_ronda = ganador
         self.mesa.reset_mesa()
         self.estado_juego = "ronda_finalizada" # La ronda ha terminado
+        self.ronda_resuelta = True
+        self._registrar_resultado(ganador)
+
+    def _registrar_resultado(self, ganador):
+        """Guarda el saldo y el resultado de la mano del jugador humano en su perfil (si hay almacén)."""
+        if self.almacen is not None:
+            self.almacen.registrar_mano(self.jugador.nombre, self.sesion, self.fichas_inicio_ronda,
+                                        self.jugador.fichas, ganador == self.jugador)
 
     def _hand_rank_to_name(self, rank_value):
         """Convierte el valor numérico del rango de la mano a un nombre legible."""
@@ -658,6 +727,19 @@ app = Flask(__name__)
 # Genera una con: os.urandom(24).hex()
 app.secret_key = 'tu_clave_secreta_super_segura_y_aleatoria_aqui_!@#$%'   
 juego_en_curso = {} # Diccionario para almacenar el juego por nombre de jugador (ID de sesión)
+# Perfiles y saldos persistentes de los jugadores (SQLite). Ruta configurable con POKER_DB.
+# El almacén se crea en el primer uso para que importar app no abra ni cree la base de datos.
+almacen_perfiles = None
+_lock_almacen = threading.Lock()
+
+def obtener_almacen_perfiles():
+    """Devuelve el almacén de perfiles, creándolo la primera vez que se necesita."""
+    global almacen_perfiles
+    with _lock_almacen:
+        if almacen_perfiles is None:
+            ruta_db = os.environ.get('POKER_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'perfiles.db'))
+            almacen_perfiles = AlmacenPerfiles(ruta_db, FICHAS_INICIALES)
+        return almacen_perfiles
 
 @app.route('/')
 def index():
@@ -669,7 +751,7 @@ def index():
     nombre_jugador = session['nombre_jugador']
     # Si el juego no está en curso para este jugador, inicialízalo
     if nombre_jugador not in juego_en_curso:
-        juego_en_curso[nombre_jugador] = PokerGame(nombre_jugador)
+        juego_en_curso[nombre_jugador] = PokerGame(nombre_jugador, obtener_almacen_perfiles())
         juego_en_curso[nombre_jugador].iniciar_ronda() # Inicia la primera ronda
 
     juego = juego_en_curso[nombre_jugador]
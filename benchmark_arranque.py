@@ -0,0 +1,83 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+# --- Benchmark de Arranque en Frío ---
+# Mide, en un proceso Python nuevo, cuánto tarda importar `app` y servir la primera
+# petición a '/' de un jugador con nombre (que crea su partida), y comprueba que ningún
+# módulo pesado (NumPy, evaluador por lotes) se cargue en ese camino.
+# Usa un directorio temporal para la caché de tablas y la base de datos de perfiles.
+# Sale con código 1 si se supera el presupuesto.
+# Para ejecutar: python benchmark_arranque.py
+
+PRESUPUESTO_ARRANQUE = 1.0 # Segundos para importar app + primera petición a '/'
+PRESUPUESTO_TABLAS = 0.5 # Segundos para cargar las tablas del evaluador desde la caché en disco
+REPETICIONES = 5 # Se toma el mejor tiempo para reducir el ruido
+MODULOS_PESADOS = ['numpy', 'evaluador']
+
+_SCRIPT_ARRANQUE = """
+import json, sys, time
+inicio = time.perf_counter()
+import app
+importado = time.perf_counter()
+cliente = app.app.test_client()
+with cliente.session_transaction() as sesion:
+    sesion['nombre_jugador'] = 'Benchmark' # Así la primera petición crea una partida
+respuesta = cliente.get('/')
+fin = time.perf_counter()
+print(json.dumps({
+    'importar': importado - inicio,
+    'primera_peticion': fin - importado,
+    'estado': respuesta.status_code,
+    'modulos_pesados': [m for m in %r if m in sys.modules],
+}))
+""" % MODULOS_PESADOS
+
+_SCRIPT_TABLAS = """
+import json, time
+inicio = time.perf_counter()
+import evaluador
+evaluador.obtener_tablas()
+print(json.dumps({'cargar_tablas': time.perf_counter() - inicio}))
+"""
+
+
+def _medir(script, entorno):
+    """Ejecuta un script en un proceso nuevo y devuelve el JSON que imprime."""
+    salida = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                            check=True, cwd=os.path.dirname(os.path.abspath(__file__)), env=entorno)
+    return json.loads(salida.stdout.strip().splitlines()[-1])
+
+
+def main():
+    errores = []
+    with tempfile.TemporaryDirectory() as directorio_cache:
+        entorno = dict(os.environ, POKER_CACHE_DIR=directorio_cache,
+                       POKER_DB=os.path.join(directorio_cache, 'perfiles.db'))
+
+        medidas = [_medir(_SCRIPT_ARRANQUE, entorno) for _ in range(REPETICIONES)]
+        mejor = min(medidas, key=lambda m: m['importar'] + m['primera_peticion'])
+        total = mejor['importar'] + mejor['primera_peticion']
+        print(f"Importar app: {mejor['importar']:.3f}s | Primera petición: {mejor['primera_peticion']:.3f}s | Total: {total:.3f}s")
+        if mejor['estado'] != 200:
+            errores.append(f"La primera petición a '/' devolvió {mejor['estado']}.")
+        if total > PRESUPUESTO_ARRANQUE:
+            errores.append(f"El arranque ({total:.3f}s) supera el presupuesto de {PRESUPUESTO_ARRANQUE}s.")
+        if mejor['modulos_pesados']:
+            errores.append(f"Módulos pesados cargados al arrancar: {', '.join(mejor['modulos_pesados'])}.")
+
+        _medir(_SCRIPT_TABLAS, entorno) # Primer uso: construye las tablas y las guarda en la caché
+        carga = min(_medir(_SCRIPT_TABLAS, entorno)['cargar_tablas'] for _ in range(REPETICIONES))
+        print(f"Cargar tablas del evaluador desde la caché: {carga:.3f}s")
+        if carga > PRESUPUESTO_TABLAS:
+            errores.append(f"La carga de tablas ({carga:.3f}s) supera el presupuesto de {PRESUPUESTO_TABLAS}s.")
+
+    for error in errores:
+        print(f"ERROR: {error}")
+    return 1 if errores else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
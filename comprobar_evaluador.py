@@ -0,0 +1,64 @@
+import random
+import sys
+
+import app
+import evaluador
+
+# --- Comprobación del Evaluador por Lotes ---
+# Compara evaluador.evaluar_manos_lote con PokerGame._get_best_hand (la referencia del juego)
+# en manos aleatorias y en manos con muchas cartas del mismo palo (colores y escaleras de color).
+# Sale con código 1 si alguna puntuación no coincide.
+# Para ejecutar: python comprobar_evaluador.py [num_manos]
+
+NUM_MANOS = 20000 # Manos de cada tipo (aleatorias y forzando color)
+SEMILLA = 12345
+
+
+def _empaquetar_referencia(rango):
+    """Convierte la tupla (categoria, kickers) de _get_best_hand en la puntuación del evaluador."""
+    categoria, kickers = rango
+    return evaluador._empaquetar(categoria, list(kickers))
+
+
+def _manos_aleatorias(generador, cartas, num_manos):
+    """Manos de 7 cartas distintas elegidas al azar."""
+    return [generador.sample(cartas, 7) for _ in range(num_manos)]
+
+
+def _manos_con_color(generador, cartas, num_manos):
+    """Manos de 7 cartas con entre 3 y 7 cartas de un mismo palo, en orden aleatorio."""
+    manos = []
+    for _ in range(num_manos):
+        palo = generador.choice(evaluador.PALOS)
+        mano = generador.sample([c for c in cartas if c.palo == palo], generador.randint(3, 7))
+        mano += generador.sample([c for c in cartas if c not in mano], 7 - len(mano))
+        generador.shuffle(mano)
+        manos.append(mano)
+    return manos
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    num_manos = int(argv[0]) if argv else NUM_MANOS
+    generador = random.Random(SEMILLA)
+    cartas = app.Baraja().cartas
+    juego = app.PokerGame("Comprobación")
+
+    manos = _manos_aleatorias(generador, cartas, num_manos) + _manos_con_color(generador, cartas, num_manos)
+    obtenidas = evaluador.evaluar_manos_lote([evaluador.cartas_a_indices(m[:2]) for m in manos],
+                                             [evaluador.cartas_a_indices(m[2:]) for m in manos])
+
+    diferencias = 0
+    for mano, obtenida in zip(manos, obtenidas):
+        esperada = _empaquetar_referencia(juego._get_best_hand(mano[:2], mano[2:]))
+        if esperada != obtenida:
+            diferencias += 1
+            if diferencias <= 10:
+                print(f"DIFERENCIA {[str(c) for c in mano]}: esperado {esperada}, obtenido {obtenida}")
+
+    print(f"{len(manos)} manos comparadas: {diferencias} diferencias.")
+    return 1 if diferencias else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,137 @@
+import os
+import sqlite3
+import sys
+import tempfile
+
+import app
+from perfiles import AlmacenPerfiles
+
+# --- Comprobación de Perfiles y Libro de Fichas ---
+# Juega rondas deterministas de PokerGame contra un AlmacenPerfiles en una base de datos
+# temporal y comprueba lo que queda guardado en perfiles, libro_fichas y sesiones:
+# retirada del jugador, retirada de la CPU, showdown, ronda abandonada y recarga de un
+# jugador sin fichas. También comprueba que volver a pulsar "avanzar fase" (o volver a
+# verificar el fin de la ronda) tras una mano terminada no la registra otra vez.
+# Sale con código 1 si alguna comprobación falla.
+# Para ejecutar: python comprobar_perfiles.py
+
+REPETICIONES_AVANZAR = 3 # Veces que se reenvía /avanzar_fase tras terminar una mano
+FASES_APUESTAS = ["pre_flop_apuestas", "flop_apuestas", "turn_apuestas", "river_apuestas"]
+
+errores = []
+
+
+def comprobar(condicion, mensaje):
+    """Anota un error si la condición no se cumple."""
+    if not condicion:
+        errores.append(mensaje)
+
+
+def _reenviar_avanzar_fase(cliente, juego, almacen, descripcion):
+    """Reenvía /avanzar_fase y llama a _verificar_fin_ronda_apuestas; el perfil no debe cambiar."""
+    antes = almacen.obtener_perfil(juego.jugador.nombre)
+    fichas_jugador, fichas_cpu = juego.jugador.fichas, juego.maquina.fichas
+    for _ in range(REPETICIONES_AVANZAR):
+        cliente.post('/avanzar_fase')
+        juego._verificar_fin_ronda_apuestas()
+    comprobar(almacen.obtener_perfil(juego.jugador.nombre) == antes,
+              f"{descripcion}: repetir /avanzar_fase cambió el perfil")
+    comprobar((juego.jugador.fichas, juego.maquina.fichas) == (fichas_jugador, fichas_cpu),
+              f"{descripcion}: repetir /avanzar_fase movió fichas")
+    comprobar(juego.estado_juego == "ronda_finalizada",
+              f"{descripcion}: el estado pasó a {juego.estado_juego!r} tras repetir /avanzar_fase")
+
+
+def _jugar_hasta_showdown(juego):
+    """El jugador pasa en cada calle (la CPU no llega a actuar) hasta el showdown."""
+    while juego.estado_juego != "ronda_finalizada":
+        if juego.es_turno_jugador_humano() and juego.estado_juego in FASES_APUESTAS:
+            juego.manejar_accion_jugador("pasar")
+        else:
+            juego.avanzar_fase_juego()
+
+
+def main():
+    with tempfile.TemporaryDirectory() as directorio:
+        ruta_db = os.path.join(directorio, 'perfiles.db')
+        almacen = AlmacenPerfiles(ruta_db, app.FICHAS_INICIALES)
+
+        juego = app.PokerGame("Ana", almacen)
+        app.juego_en_curso["Ana"] = juego
+        cliente = app.app.test_client()
+        with cliente.session_transaction() as sesion:
+            sesion['nombre_jugador'] = "Ana"
+
+        # 1. El jugador apuesta 20 y se retira: pierde 20
+        juego.iniciar_ronda(1)
+        juego.manejar_accion_jugador("apostar", 20)
+        juego.manejar_accion_jugador("retirarse")
+        comprobar(juego.ganador_ronda is juego.maquina, "Retirada del jugador: la CPU no ganó el bote")
+        _reenviar_avanzar_fase(cliente, juego, almacen, "Retirada del jugador")
+
+        # 2. El jugador apuesta 20 y la CPU se retira: recupera sus 20 y gana la mano
+        juego.iniciar_ronda(2)
+        juego.manejar_accion_jugador("apostar", 20)
+        juego.maquina.retirarse()
+        juego._verificar_fin_ronda_apuestas()
+        comprobar(juego.ganador_ronda is juego.jugador, "Retirada de la CPU: el jugador no ganó el bote")
+        _reenviar_avanzar_fase(cliente, juego, almacen, "Retirada de la CPU")
+
+        # 3. Showdown sin apuestas: el bote es 0, gana quien tenga la mejor mano
+        juego.iniciar_ronda(3)
+        _jugar_hasta_showdown(juego)
+        ganada_showdown = juego.ganador_ronda is juego.jugador
+        _reenviar_avanzar_fase(cliente, juego, almacen, "Showdown")
+
+        # 4. Ronda abandonada tras apostar 20: cuenta como perdida al empezar la siguiente
+        juego.iniciar_ronda(4)
+        juego.manejar_accion_jugador("apostar", 20)
+        juego.iniciar_ronda(5) # Esta última ronda queda en curso y no se registra
+
+        perfil = almacen.obtener_perfil("Ana")
+        ganadas = 1 + ganada_showdown
+        comprobar(perfil['manos_jugadas'] == 4, f"Ana: manos_jugadas = {perfil['manos_jugadas']}, se esperaban 4")
+        comprobar(perfil['manos_ganadas'] == ganadas, f"Ana: manos_ganadas = {perfil['manos_ganadas']}, se esperaban {ganadas}")
+        comprobar(perfil['manos_perdidas'] == 4 - ganadas, f"Ana: manos_perdidas = {perfil['manos_perdidas']}, se esperaban {4 - ganadas}")
+        comprobar(perfil['fichas'] == app.FICHAS_INICIALES - 40,
+                  f"Ana: fichas = {perfil['fichas']}, se esperaban {app.FICHAS_INICIALES - 40}")
+
+        # 5. Recarga: Bea pierde todas sus fichas y vuelve a jugar
+        almacen.registrar_mano("Bea", "sesion-previa", app.FICHAS_INICIALES, 0, False)
+        juego_bea = app.PokerGame("Bea", almacen)
+        comprobar(juego_bea.jugador.fichas == app.FICHAS_INICIALES, "Bea: no se recargaron las fichas iniciales")
+
+        almacen.vaciar()
+        almacen.cerrar()
+
+        with sqlite3.connect(ruta_db) as conexion:
+            libro_ana = conexion.execute(
+                "SELECT tipo, variacion, ganada FROM libro_fichas WHERE nombre = 'Ana' ORDER BY id").fetchall()
+            esperado = [('mano', -20, 0), ('mano', 0, 1), ('mano', 0, int(ganada_showdown)), ('mano', -20, 0)]
+            comprobar(libro_ana == esperado, f"Ana: libro_fichas = {libro_ana}, se esperaba {esperado}")
+
+            sesiones = conexion.execute(
+                "SELECT manos_jugadas, manos_ganadas, manos_perdidas, fichas_netas FROM sesiones WHERE sesion = ?",
+                (juego.sesion,)).fetchall()
+            esperado = [(4, ganadas, 4 - ganadas, -40)]
+            comprobar(sesiones == esperado, f"Ana: sesión = {sesiones}, se esperaba {esperado}")
+
+            libro_bea = conexion.execute(
+                "SELECT tipo, variacion, fichas FROM libro_fichas WHERE nombre = 'Bea' ORDER BY id").fetchall()
+            esperado = [('mano', -app.FICHAS_INICIALES, 0), ('recarga', app.FICHAS_INICIALES, app.FICHAS_INICIALES)]
+            comprobar(libro_bea == esperado, f"Bea: libro_fichas = {libro_bea}, se esperaba {esperado}")
+            netas_bea = conexion.execute("SELECT SUM(fichas_netas) FROM sesiones WHERE nombre = 'Bea'").fetchone()[0]
+            comprobar(netas_bea == -app.FICHAS_INICIALES, f"Bea: la recarga contó como ganancia de sesión ({netas_bea})")
+
+        # 6. Tras "reiniciar" (un almacén nuevo sobre la misma base de datos) el saldo se conserva
+        reabierto = AlmacenPerfiles(ruta_db, app.FICHAS_INICIALES).obtener_perfil("Ana")
+        comprobar(reabierto == perfil, f"Ana: perfil tras reabrir = {reabierto}, se esperaba {perfil}")
+
+    for error in errores:
+        print(f"ERROR: {error}")
+    print(f"Comprobación de perfiles: {len(errores)} errores.")
+    return 1 if errores else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
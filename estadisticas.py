@@ -0,0 +1,145 @@
+# --- Estadísticas de Oponente ---
+# Modelo incremental del estilo de juego de un jugador, pensado para que la CPU lo consulte.
+# Cada acción actualiza un número fijo de contadores en O(1) (nunca se recorre el historial)
+# y, al empezar cada mano, todos los contadores se multiplican por un factor de decaimiento,
+# de modo que las manos recientes pesan más y el modelo se adapta si el jugador cambia de estilo.
+# Las estimaciones se suavizan hacia valores previos mientras hay pocos datos.
+
+FACTOR_DECAIMIENTO = 0.98 # Peso que conserva cada mano anterior al empezar una nueva
+PESO_PREVIO = 5.0 # Cuántas "manos" equivalentes pesan los valores previos
+NUM_CALLES = 4 # 0=Pre-flop, 1=Flop, 2=Turn, 3=River
+
+# Valores previos (jugador "medio") usados mientras no hay suficientes datos
+VPIP_PREVIO = 0.5
+PFR_PREVIO = 0.2
+AGRESION_PREVIA = 1.0
+RETIRADA_ANTE_APUESTA_PREVIA = 0.4
+SHOWDOWN_PREVIO = 0.3
+
+ACCIONES_AGRESIVAS = ("apostar", "subir", "all-in")
+ACCIONES_VOLUNTARIAS = ("apostar", "igualar", "subir", "all-in")
+
+
+class EstadisticasJugador:
+    """
+    Estadísticas de un jugador con decaimiento exponencial:
+    VPIP, PFR, factor de agresión, retirada ante apuesta por calle y frecuencia de showdown.
+    """
+    def __init__(self, factor_decaimiento=FACTOR_DECAIMIENTO):
+        self.factor_decaimiento = factor_decaimiento
+        self.manos = 0.0
+        self.manos_vpip = 0.0 # Manos en las que metió fichas voluntariamente pre-flop
+        self.manos_pfr = 0.0 # Manos en las que apostó/subió pre-flop
+        self.acciones_agresivas = 0.0 # Apuestas y subidas
+        self.igualadas = 0.0
+        self.ante_apuesta = [0.0] * NUM_CALLES # Veces que tuvo que responder a una apuesta, por calle
+        self.retiradas_ante_apuesta = [0.0] * NUM_CALLES
+        self.manos_vio_flop = 0.0
+        self.manos_showdown = 0.0
+        # Indicadores de la mano en curso (para contar cada mano una sola vez)
+        self._vpip_en_mano = False
+        self._pfr_en_mano = False
+
+    def iniciar_mano(self):
+        """Aplica el decaimiento a todos los contadores y empieza a contar una mano nueva."""
+        f = self.factor_decaimiento
+        self.manos = self.manos * f + 1
+        self.manos_vpip *= f
+        self.manos_pfr *= f
+        self.acciones_agresivas *= f
+        self.igualadas *= f
+        for calle in range(NUM_CALLES):
+            self.ante_apuesta[calle] *= f
+            self.retiradas_ante_apuesta[calle] *= f
+        self.manos_vio_flop *= f
+        self.manos_showdown *= f
+        self._vpip_en_mano = False
+        self._pfr_en_mano = False
+
+    def registrar_accion(self, calle, accion, frente_a_apuesta):
+        """
+        Registra una acción del jugador.
+        calle: 0=Pre-flop, 1=Flop, 2=Turn, 3=River.
+        frente_a_apuesta: True si tenía una apuesta pendiente de igualar al actuar.
+        """
+        if calle == 0:
+            if accion in ACCIONES_VOLUNTARIAS and not self._vpip_en_mano:
+                self.manos_vpip += 1
+                self._vpip_en_mano = True
+            if accion in ACCIONES_AGRESIVAS and not self._pfr_en_mano:
+                self.manos_pfr += 1
+                self._pfr_en_mano = True
+
+        if accion in ACCIONES_AGRESIVAS:
+            self.acciones_agresivas += 1
+        elif accion == "igualar":
+            self.igualadas += 1
+
+        if frente_a_apuesta:
+            self.ante_apuesta[calle] += 1
+            if accion == "retirarse":
+                self.retiradas_ante_apuesta[calle] += 1
+
+    def registrar_flop(self):
+        """Registra que el jugador llegó al flop sin retirarse."""
+        self.manos_vio_flop += 1
+
+    def registrar_showdown(self):
+        """Registra que el jugador llegó al showdown."""
+        self.manos_showdown += 1
+
+    def cargar_historial(self, historial):
+        """
+        Rellena las estadísticas a partir de manos ya jugadas, en orden cronológico.
+        Cada mano es un dict con:
+        - 'acciones': lista de (calle, accion, frente_a_apuesta).
+        - 'vio_flop' (opcional): si llegó al flop; por defecto, si actuó en alguna calle posterior.
+        - 'showdown' (opcional): si llegó al showdown.
+        """
+        for mano in historial:
+            self.iniciar_mano()
+            acciones = mano.get('acciones', [])
+            for calle, accion, frente_a_apuesta in acciones:
+                self.registrar_accion(calle, accion, frente_a_apuesta)
+            if mano.get('vio_flop', any(calle > 0 for calle, _, _ in acciones)):
+                self.registrar_flop()
+            if mano.get('showdown', False):
+                self.registrar_showdown()
+
+    # --- Consultas (O(1)) ---
+
+    def _suavizar(self, casos, total, previo):
+        """Proporción casos/total suavizada hacia el valor previo."""
+        return (casos + previo * PESO_PREVIO) / (total + PESO_PREVIO)
+
+    def vpip(self):
+        """Fracción de manos en las que mete fichas voluntariamente pre-flop."""
+        return self._suavizar(self.manos_vpip, self.manos, VPIP_PREVIO)
+
+    def pfr(self):
+        """Fracción de manos en las que apuesta o sube pre-flop."""
+        return self._suavizar(self.manos_pfr, self.manos, PFR_PREVIO)
+
+    def factor_agresion(self):
+        """(Apuestas + subidas) / igualadas."""
+        return self._suavizar(self.acciones_agresivas, self.igualadas, AGRESION_PREVIA)
+
+    def retirada_ante_apuesta(self, calle):
+        """Fracción de veces que se retira cuando le apuestan en la calle dada."""
+        return self._suavizar(self.retiradas_ante_apuesta[calle], self.ante_apuesta[calle],
+                              RETIRADA_ANTE_APUESTA_PREVIA)
+
+    def frecuencia_showdown(self):
+        """Fracción de las manos en las que ve el flop que llegan al showdown."""
+        return self._suavizar(self.manos_showdown, self.manos_vio_flop, SHOWDOWN_PREVIO)
+
+    def resumen(self):
+        """Devuelve todas las estadísticas en un diccionario (útil para depuración)."""
+        return {
+            'manos': self.manos,
+            'vpip': self.vpip(),
+            'pfr': self.pfr(),
+            'factor_agresion': self.factor_agresion(),
+            'retirada_ante_apuesta': [self.retirada_ante_apuesta(c) for c in range(NUM_CALLES)],
+            'frecuencia_showdown': self.frecuencia_showdown(),
+        }
@@ -0,0 +1,340 @@
+import hashlib
+import io
+import itertools
+import json
+import os
+import numpy as np
+
+# --- Evaluador de Manos por Lotes ---
+# Evalúa muchas manos de 7 cartas (2 del jugador + 5 comunitarias) en una sola llamada
+# usando tablas de búsqueda y operaciones vectorizadas de NumPy.
+#
+# Codificación de cartas: un entero 0..51 = indice_palo * 13 + (valor_rank - 2),
+# con los palos en el mismo orden que Baraja ('♠', '♥', '♦', '♣').
+#
+# Las puntuaciones son enteros que respetan el mismo orden que las tuplas devueltas
+# por PokerGame._get_best_hand: categoria << 20 | kicker1 << 16 | ... | kicker5.
+
+PALOS = ['♠', '♥', '♦', '♣']
+TAM_BLOQUE = 65536 # Manos evaluadas por bloque (limita la memoria usada en lotes grandes)
+EMPATE = -1 # Índice de ganador cuando varios jugadores empatan con la mejor mano
+
+# Las tablas se construyen una sola vez, se guardan en disco y se cargan mapeadas en memoria
+# la primera vez que se necesitan. Incrementa VERSION_TABLAS si cambia su formato o contenido.
+VERSION_TABLAS = 1
+DIRECTORIO_CACHE = os.environ.get(
+    'POKER_CACHE_DIR', os.path.join(os.path.expanduser('~'), '.cache', 'poker_visual'))
+_NOMBRES_TABLAS = ('tabla_color', 'claves_rangos', 'tabla_rangos')
+_tablas = None # Tablas ya cargadas en este proceso
+
+
+def carta_a_indice(carta):
+    """Convierte un objeto Carta en su índice entero 0..51."""
+    return PALOS.index(carta.palo) * 13 + (carta.valor_rank - 2)
+
+
+def cartas_a_indices(cartas):
+    """Convierte una lista de objetos Carta en una lista de índices enteros."""
+    return [carta_a_indice(carta) for carta in cartas]
+
+
+def _empaquetar(categoria, kickers):
+    """Empaqueta una categoría y hasta 5 kickers en un entero comparable."""
+    puntuacion = categoria
+    for i in range(5):
+        puntuacion = (puntuacion << 4) | (kickers[i] if i < len(kickers) else 0)
+    return puntuacion
+
+
+def categoria_de(puntuaciones):
+    """Devuelve la categoría de mano (0=Carta Alta ... 9=Escalera Real de Color)."""
+    return np.asarray(puntuaciones) >> 20
+
+
+def _escalera_mas_alta(mascara):
+    """
+    Devuelve la carta más alta de la mejor escalera contenida en una máscara de 13 bits
+    (bit 0 = '2', bit 12 = 'A'), o 0 si no hay escalera. Maneja la escalera A-2-3-4-5.
+    """
+    for alta in range(12, 3, -1):
+        patron = 0b11111 << (alta - 4)
+        if mascara & patron == patron:
+            return alta + 2
+    if mascara & 0b1000000001111 == 0b1000000001111:
+        return 5
+    return 0
+
+
+def _puntuar_color(mascara):
+    """Puntuación de la mejor mano de color para una máscara de rangos de un mismo palo."""
+    alta = _escalera_mas_alta(mascara)
+    if alta == 14:
+        return _empaquetar(9, [14, 13, 12, 11, 10])
+    if alta:
+        return _empaquetar(8, [alta])
+    rangos = [r + 2 for r in range(12, -1, -1) if mascara >> r & 1]
+    return _empaquetar(5, rangos[:5])
+
+
+def _puntuar_conteos(conteos):
+    """
+    Puntuación de la mejor mano sin color a partir de los conteos de cada rango
+    (conteos[0] = número de '2', ..., conteos[12] = número de 'A').
+    """
+    presentes = [r + 2 for r in range(12, -1, -1) if conteos[r]] # De mayor a menor
+    por_conteo = lambda minimo: [r for r in presentes if conteos[r - 2] >= minimo]
+
+    cuartetos = por_conteo(4)
+    if cuartetos:
+        kicker = [r for r in presentes if r != cuartetos[0]][0]
+        return _empaquetar(7, [cuartetos[0], kicker])
+
+    trios = por_conteo(3)
+    if trios:
+        parejas = [r for r in por_conteo(2) if r != trios[0]]
+        if parejas:
+            return _empaquetar(6, [trios[0], parejas[0]])
+
+    mascara = sum(1 << (r - 2) for r in presentes)
+    alta = _escalera_mas_alta(mascara)
+    if alta:
+        return _empaquetar(4, [alta])
+
+    if trios:
+        kickers = [r for r in presentes if r != trios[0]]
+        return _empaquetar(3, [trios[0]] + kickers[:2])
+
+    parejas = por_conteo(2)
+    if len(parejas) >= 2:
+        kicker = [r for r in presentes if r not in parejas[:2]][0]
+        return _empaquetar(2, parejas[:2] + [kicker])
+    if parejas:
+        kickers = [r for r in presentes if r != parejas[0]]
+        return _empaquetar(1, [parejas[0]] + kickers[:3])
+
+    return _empaquetar(0, presentes[:5])
+
+
+def _conteos_de_siete():
+    """Genera todos los vectores de conteo de rangos posibles para 7 cartas (máx. 4 por rango)."""
+    for combo in itertools.combinations_with_replacement(range(13), 7):
+        conteos = [0] * 13
+        for r in combo:
+            conteos[r] += 1
+        if max(conteos) <= 4:
+            yield conteos
+
+
+def _construir_tablas():
+    """
+    Construye las tablas de búsqueda:
+    - tabla_color: puntuación para cada máscara de 13 bits de un palo con 5+ cartas.
+    - claves_rangos / tabla_rangos: claves en base 5 de los conteos de rangos (ordenadas)
+      y la puntuación sin color correspondiente.
+    """
+    tabla_color = np.zeros(1 << 13, dtype=np.int32)
+    for mascara in range(1 << 13):
+        if bin(mascara).count("1") >= 5:
+            tabla_color[mascara] = _puntuar_color(mascara)
+
+    claves, puntuaciones = [], []
+    for conteos in _conteos_de_siete():
+        claves.append(sum(c * 5 ** r for r, c in enumerate(conteos)))
+        puntuaciones.append(_puntuar_conteos(conteos))
+    orden = np.argsort(claves)
+    claves_rangos = np.asarray(claves, dtype=np.int64)[orden]
+    tabla_rangos = np.asarray(puntuaciones, dtype=np.int32)[orden]
+    return tabla_color, claves_rangos, tabla_rangos
+
+
+def _checksum(ruta):
+    """Calcula el SHA-256 de un archivo."""
+    with open(ruta, 'rb') as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _cargar_tablas_cache(directorio):
+    """
+    Carga las tablas desde la caché en disco, mapeadas en memoria.
+    Devuelve None si la caché no existe, es de otra versión o algún checksum no coincide.
+    """
+    try:
+        with open(os.path.join(directorio, 'tablas.json'), encoding='utf-8') as f:
+            meta = json.load(f)
+        if meta.get('version') != VERSION_TABLAS:
+            return None
+        tablas = []
+        for nombre in _NOMBRES_TABLAS:
+            ruta = os.path.join(directorio, nombre + '.npy')
+            if _checksum(ruta) != meta['checksums'][nombre]:
+                return None
+            tablas.append(np.load(ruta, mmap_mode='r'))
+        return tuple(tablas)
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _guardar_tablas_cache(directorio, tablas):
+    """
+    Guarda las tablas en la caché en disco. Cada archivo se escribe en un temporal y se
+    renombra, y los metadatos se escriben al final, para que otro proceso nunca lea
+    una caché a medio escribir.
+    """
+    os.makedirs(directorio, exist_ok=True)
+    checksums = {}
+    for nombre, tabla in zip(_NOMBRES_TABLAS, tablas):
+        ruta = os.path.join(directorio, nombre + '.npy')
+        buffer = io.BytesIO()
+        np.save(buffer, tabla)
+        contenido = buffer.getvalue()
+        checksums[nombre] = hashlib.sha256(contenido).hexdigest()
+        temporal = f"{ruta}.{os.getpid()}.tmp"
+        with open(temporal, 'wb') as f:
+            f.write(contenido)
+        os.replace(temporal, ruta)
+
+    ruta_meta = os.path.join(directorio, 'tablas.json')
+    temporal = f"{ruta_meta}.{os.getpid()}.tmp"
+    with open(temporal, 'w', encoding='utf-8') as f:
+        json.dump({'version': VERSION_TABLAS, 'checksums': checksums}, f)
+    os.replace(temporal, ruta_meta)
+
+
+def obtener_tablas(directorio=None):
+    """
+    Devuelve (tabla_color, claves_rangos, tabla_rangos), cargándolas en el primer uso.
+    Usa la caché en disco si es válida; si no, construye las tablas e intenta guardarlas.
+    """
+    global _tablas
+    if _tablas is None:
+        directorio = directorio or DIRECTORIO_CACHE
+        tablas = _cargar_tablas_cache(directorio)
+        if tablas is None:
+            tablas = _construir_tablas()
+            try:
+                _guardar_tablas_cache(directorio, tablas)
+            except OSError:
+                pass # Sin caché en disco (ej. sistema de solo lectura): se usan las tablas en memoria
+        _tablas = tablas
+    return _tablas
+
+
+_POTENCIAS_5 = 5 ** np.arange(13, dtype=np.int64)
+
+
+def _evaluar_bloque(cartas):
+    """Evalúa un bloque (M, 7) de cartas y devuelve un array (M,) de puntuaciones."""
+    tabla_color, claves_rangos, tabla_rangos = obtener_tablas()
+    valores = cartas % 13
+    palos = cartas // 13
+
+    conteos = (valores[:, :, None] == np.arange(13)).sum(axis=1)
+    claves = conteos @ _POTENCIAS_5
+    puntuaciones = tabla_rangos[np.searchsorted(claves_rangos, claves)]
+
+    conteos_palo = (palos[:, :, None] == np.arange(4)).sum(axis=1)
+    palo_color = conteos_palo.argmax(axis=1)
+    hay_color = conteos_palo.max(axis=1) >= 5
+    if hay_color.any():
+        del_palo = palos[hay_color] == palo_color[hay_color, None]
+        mascaras = np.where(del_palo, 1 << valores[hay_color], 0).sum(axis=1)
+        puntuaciones[hay_color] = tabla_color[mascaras]
+    return puntuaciones
+
+
+def _validar_cartas(cartas):
+    """
+    Comprueba que un bloque (M, K) de cartas solo tenga índices 0..51 y ninguna carta
+    repetida en la misma fila. Lanza ValueError si no es así.
+    """
+    if cartas.size and (cartas.min() < 0 or cartas.max() > 51):
+        raise ValueError("Los índices de carta deben estar entre 0 y 51.")
+    ordenadas = np.sort(cartas, axis=1)
+    if (ordenadas[:, 1:] == ordenadas[:, :-1]).any():
+        raise ValueError("Hay cartas repetidas en una misma mano.")
+
+
+def evaluar_manos_lote(cartas_jugador, cartas_comunitarias, tam_bloque=TAM_BLOQUE):
+    """
+    Evalúa N manos en una sola llamada.
+    cartas_jugador: array (N, 2) de índices de cartas.
+    cartas_comunitarias: array (N, 5) de índices de cartas.
+    Devuelve un array (N,) de puntuaciones (mayor es mejor).
+    Lanza ValueError si alguna carta no está entre 0 y 51 o está repetida en su mano.
+    """
+    cartas_jugador = np.asarray(cartas_jugador)
+    cartas_comunitarias = np.asarray(cartas_comunitarias)
+    if cartas_jugador.ndim != 2 or cartas_jugador.shape[1] != 2:
+        raise ValueError("cartas_jugador debe tener forma (N, 2).")
+    if cartas_comunitarias.shape != (len(cartas_jugador), 5):
+        raise ValueError("cartas_comunitarias debe tener forma (N, 5).")
+
+    puntuaciones = np.empty(len(cartas_jugador), dtype=np.int32)
+    for inicio in range(0, len(cartas_jugador), tam_bloque):
+        fin = inicio + tam_bloque
+        # La conversión a int64 se hace por bloque para no copiar toda la entrada
+        cartas = np.concatenate([cartas_jugador[inicio:fin], cartas_comunitarias[inicio:fin]],
+                                axis=1).astype(np.int64)
+        _validar_cartas(cartas)
+        puntuaciones[inicio:fin] = _evaluar_bloque(cartas)
+    return puntuaciones
+
+
+def showdown_lote(manos, cartas_comunitarias, tam_bloque=TAM_BLOQUE):
+    """
+    Resuelve N showdowns en una sola llamada.
+    manos: array (N, 2) para un único jugador por mesa o (N, P, 2) para P jugadores.
+    cartas_comunitarias: array (N, 5).
+    Devuelve (puntuaciones, ganadores): puntuaciones con forma (N, P) y ganadores (N,)
+    con el índice del jugador ganador en cada mesa, o EMPATE si la mejor mano está repartida.
+    Lanza ValueError si alguna carta no está entre 0 y 51 o está repetida en su mesa.
+    """
+    manos = np.asarray(manos)
+    if manos.ndim == 2:
+        manos = manos[:, None, :]
+    if manos.ndim != 3 or manos.shape[2] != 2:
+        raise ValueError("manos debe tener forma (N, 2) o (N, P, 2).")
+    cartas_comunitarias = np.asarray(cartas_comunitarias)
+    num_mesas, num_jugadores = manos.shape[:2]
+    if cartas_comunitarias.shape != (num_mesas, 5):
+        raise ValueError("cartas_comunitarias debe tener forma (N, 5).")
+
+    puntuaciones = np.empty((num_mesas, num_jugadores), dtype=np.int32)
+    mesas_por_bloque = max(1, tam_bloque // max(1, num_jugadores))
+    for inicio in range(0, num_mesas, mesas_por_bloque):
+        fin = inicio + mesas_por_bloque
+        manos_bloque = manos[inicio:fin].astype(np.int64)
+        comunitarias_bloque = cartas_comunitarias[inicio:fin].astype(np.int64)
+        # Todas las cartas de una mesa (de todos los jugadores y comunitarias) deben ser distintas
+        _validar_cartas(np.concatenate([manos_bloque.reshape(len(manos_bloque), -1), comunitarias_bloque], axis=1))
+
+        # Aplanar (M, P) -> M*P manos; cada mesa comparte sus cartas comunitarias
+        cartas = np.concatenate([manos_bloque.reshape(-1, 2),
+                                 np.repeat(comunitarias_bloque, num_jugadores, axis=0)], axis=1)
+        puntuaciones[inicio:fin] = _evaluar_bloque(cartas).reshape(-1, num_jugadores)
+
+    ganadores = puntuaciones.argmax(axis=1)
+    mejores = puntuaciones.max(axis=1, keepdims=True)
+    empates = (puntuaciones == mejores).sum(axis=1) > 1
+    ganadores[empates] = EMPATE
+    return puntuaciones, ganadores
+
+
+def showdown_desde_archivo(ruta, num_jugadores, tam_bloque=TAM_BLOQUE):
+    """
+    Generador que resuelve showdowns leídos de un archivo binario mapeado en memoria,
+    para entradas más grandes que la RAM.
+    Cada fila del archivo son num_jugadores * 2 + 5 bytes (uint8): primero las cartas de
+    cada jugador y después las 5 comunitarias.
+    Produce (puntuaciones, ganadores) por cada bloque de hasta tam_bloque mesas.
+    """
+    ancho = num_jugadores * 2 + 5
+    datos = np.memmap(ruta, dtype=np.uint8, mode='r')
+    if datos.size % ancho:
+        raise ValueError(f"El tamaño del archivo no es múltiplo de {ancho} bytes por fila.")
+    filas = datos.reshape(-1, ancho)
+
+    for inicio in range(0, len(filas), tam_bloque):
+        bloque = np.asarray(filas[inicio:inicio + tam_bloque])
+        manos = bloque[:, :num_jugadores * 2].reshape(-1, num_jugadores, 2)
+        yield showdown_lote(manos, bloque[:, num_jugadores * 2:], tam_bloque)
@@ -0,0 +1,237 @@
+import atexit
+import logging
+import queue
+import sqlite3
+import threading
+import time
+
+# --- Perfiles de Jugador y Libro de Fichas ---
+# Guarda en SQLite el saldo, las manos jugadas y las ganadas/perdidas de cada jugador,
+# además de un libro de fichas por mano y un resumen por sesión.
+# Las lecturas se sirven desde una caché en memoria y las escrituras se encolan y las
+# aplica un hilo en segundo plano en lotes (una transacción por lote), para no añadir
+# latencia a las acciones del juego.
+
+TAM_LOTE = 100 # Máximo de operaciones por transacción
+ESPERA_LOTE = 0.2 # Segundos que el hilo escritor espera para agrupar más operaciones
+
+registro = logging.getLogger(__name__)
+
+_ESQUEMA = """
+CREATE TABLE IF NOT EXISTS perfiles (
+    nombre TEXT PRIMARY KEY,
+    fichas INTEGER NOT NULL,
+    manos_jugadas INTEGER NOT NULL DEFAULT 0,
+    manos_ganadas INTEGER NOT NULL DEFAULT 0,
+    manos_perdidas INTEGER NOT NULL DEFAULT 0,
+    actualizado REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS libro_fichas (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    nombre TEXT NOT NULL,
+    sesion TEXT NOT NULL,
+    tipo TEXT NOT NULL, -- 'mano' o 'recarga'
+    variacion INTEGER NOT NULL,
+    fichas INTEGER NOT NULL,
+    ganada INTEGER NOT NULL,
+    momento REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sesiones (
+    sesion TEXT PRIMARY KEY,
+    nombre TEXT NOT NULL,
+    inicio REAL NOT NULL,
+    fin REAL NOT NULL,
+    manos_jugadas INTEGER NOT NULL DEFAULT 0,
+    manos_ganadas INTEGER NOT NULL DEFAULT 0,
+    manos_perdidas INTEGER NOT NULL DEFAULT 0,
+    fichas_netas INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+_FIN = object() # Marca para detener el hilo escritor
+
+
+class AlmacenPerfiles:
+    """Almacén de perfiles de jugador con caché en memoria y escrituras agrupadas."""
+    def __init__(self, ruta_db, fichas_iniciales, tam_lote=TAM_LOTE, espera_lote=ESPERA_LOTE):
+        self.ruta_db = ruta_db
+        self.fichas_iniciales = fichas_iniciales
+        self.tam_lote = tam_lote
+        self.espera_lote = espera_lote
+        self._cache = {} # nombre -> dict del perfil
+        self._lock = threading.Lock()
+        self._cola = queue.Queue()
+        self._hilo = None
+
+        with self._conectar() as conexion:
+            conexion.execute("PRAGMA journal_mode=WAL") # Las lecturas no bloquean al escritor
+            conexion.executescript(_ESQUEMA)
+        atexit.register(self.cerrar) # No perder escrituras pendientes al salir
+
+    def _conectar(self):
+        """Abre una conexión nueva a la base de datos."""
+        return sqlite3.connect(self.ruta_db, timeout=30)
+
+    def obtener_perfil(self, nombre):
+        """
+        Devuelve una copia del perfil del jugador (fichas, manos jugadas, ganadas y perdidas).
+        Si el jugador no existe, devuelve un perfil nuevo con las fichas iniciales.
+        """
+        with self._lock:
+            return dict(self._perfil_en_cache(nombre))
+
+    def _perfil_en_cache(self, nombre):
+        """Devuelve el perfil en caché, leyéndolo de la base de datos si no está. Requiere self._lock."""
+        perfil = self._cache.get(nombre)
+        if perfil is None:
+            with self._conectar() as conexion:
+                fila = conexion.execute(
+                    "SELECT fichas, manos_jugadas, manos_ganadas, manos_perdidas FROM perfiles WHERE nombre = ?",
+                    (nombre,)).fetchone()
+            if fila is None:
+                fila = (self.fichas_iniciales, 0, 0, 0)
+            perfil = {
+                'nombre': nombre,
+                'fichas': fila[0],
+                'manos_jugadas': fila[1],
+                'manos_ganadas': fila[2],
+                'manos_perdidas': fila[3],
+            }
+            self._cache[nombre] = perfil
+        return perfil
+
+    def registrar_mano(self, nombre, sesion, fichas_inicio, fichas, ganada):
+        """
+        Registra el resultado de una mano: las fichas del jugador al empezarla, su saldo al
+        terminarla y si la ganó.
+        Actualiza la caché al momento y encola la escritura para el hilo en segundo plano.
+        """
+        with self._lock:
+            perfil = self._perfil_en_cache(nombre)
+            perfil['fichas'] = fichas
+            perfil['manos_jugadas'] += 1
+            if ganada:
+                perfil['manos_ganadas'] += 1
+            else:
+                perfil['manos_perdidas'] += 1
+            self._iniciar_escritor()
+        self._cola.put(('mano', nombre, sesion, fichas, fichas - fichas_inicio, ganada, time.time()))
+
+    def registrar_recarga(self, nombre, sesion, fichas):
+        """
+        Registra una recarga de fichas (ej. al volver a jugar sin fichas) como una entrada
+        propia del libro, sin contarla como mano jugada ni como ganancia de la sesión.
+        """
+        with self._lock:
+            perfil = self._perfil_en_cache(nombre)
+            variacion = fichas - perfil['fichas']
+            perfil['fichas'] = fichas
+            self._iniciar_escritor()
+        self._cola.put(('recarga', nombre, sesion, fichas, variacion, False, time.time()))
+
+    def vaciar(self):
+        """Bloquea hasta que todas las escrituras encoladas se hayan guardado."""
+        self._cola.join()
+
+    def cerrar(self):
+        """Guarda las escrituras pendientes y detiene el hilo escritor."""
+        with self._lock:
+            hilo, self._hilo = self._hilo, None
+        if hilo is not None:
+            self._cola.put(_FIN)
+            hilo.join()
+
+    def _iniciar_escritor(self):
+        """Arranca el hilo escritor en la primera escritura. Requiere self._lock."""
+        if self._hilo is None:
+            self._hilo = threading.Thread(target=self._bucle_escritor, name="escritor-perfiles", daemon=True)
+            self._hilo.start()
+
+    def _bucle_escritor(self):
+        """Saca operaciones de la cola y las guarda en lotes, una transacción por lote."""
+        conexion = self._conectar()
+        try:
+            terminar = False
+            while not terminar:
+                lote = [self._cola.get()]
+                limite = time.monotonic() + self.espera_lote
+                while len(lote) < self.tam_lote and lote[-1] is not _FIN:
+                    restante = limite - time.monotonic()
+                    if restante <= 0:
+                        break
+                    try:
+                        lote.append(self._cola.get(timeout=restante))
+                    except queue.Empty:
+                        break
+
+                try:
+                    if lote[-1] is _FIN:
+                        terminar = True
+                    operaciones = [op for op in lote if op is not _FIN]
+                    if operaciones:
+                        self._guardar_lote(conexion, operaciones)
+                except Exception:
+                    # Un error inesperado no debe matar al hilo: se descarta el lote y se sigue
+                    registro.exception("Error inesperado en el escritor de perfiles; se descarta el lote")
+                finally:
+                    for _ in lote:
+                        self._cola.task_done()
+        finally:
+            conexion.close()
+
+    def _guardar_lote(self, conexion, operaciones):
+        """
+        Guarda un lote en una sola transacción. Si falla, lo reintenta operación a operación
+        para no perder las que sí se pueden guardar, y descarta (registrando el error) las que no.
+        """
+        try:
+            with conexion: # Confirma (o revierte) todo el lote de una vez
+                for operacion in operaciones:
+                    self._aplicar(conexion, *operacion)
+            return
+        except sqlite3.Error:
+            registro.exception("Error al guardar un lote de %d operaciones; se reintentan una a una", len(operaciones))
+
+        for operacion in operaciones:
+            try:
+                with conexion:
+                    self._aplicar(conexion, *operacion)
+            except sqlite3.Error:
+                registro.exception("Se descarta la operación %r del jugador %r", operacion[0], operacion[1])
+
+    def _aplicar(self, conexion, tipo, nombre, sesion, fichas, variacion, ganada, momento):
+        """Aplica una mano o una recarga al perfil, al libro de fichas y (si es una mano) a la sesión."""
+        if tipo == 'recarga':
+            conexion.execute(
+                """INSERT INTO perfiles (nombre, fichas, actualizado) VALUES (?, ?, ?)
+                   ON CONFLICT(nombre) DO UPDATE SET fichas = excluded.fichas, actualizado = excluded.actualizado""",
+                (nombre, fichas, momento))
+            conexion.execute(
+                "INSERT INTO libro_fichas (nombre, sesion, tipo, variacion, fichas, ganada, momento) VALUES (?, ?, ?, ?, ?, 0, ?)",
+                (nombre, sesion, tipo, variacion, fichas, momento))
+            return
+
+        ganadas, perdidas = (1, 0) if ganada else (0, 1)
+        conexion.execute(
+            """INSERT INTO perfiles (nombre, fichas, manos_jugadas, manos_ganadas, manos_perdidas, actualizado)
+               VALUES (?, ?, 1, ?, ?, ?)
+               ON CONFLICT(nombre) DO UPDATE SET
+                   fichas = excluded.fichas,
+                   manos_jugadas = manos_jugadas + 1,
+                   manos_ganadas = manos_ganadas + excluded.manos_ganadas,
+                   manos_perdidas = manos_perdidas + excluded.manos_perdidas,
+                   actualizado = excluded.actualizado""",
+            (nombre, fichas, ganadas, perdidas, momento))
+        conexion.execute(
+            "INSERT INTO libro_fichas (nombre, sesion, tipo, variacion, fichas, ganada, momento) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (nombre, sesion, tipo, variacion, fichas, int(ganada), momento))
+        conexion.execute(
+            """INSERT INTO sesiones (sesion, nombre, inicio, fin, manos_jugadas, manos_ganadas, manos_perdidas, fichas_netas)
+               VALUES (?, ?, ?, ?, 1, ?, ?, ?)
+               ON CONFLICT(sesion) DO UPDATE SET
+                   fin = excluded.fin,
+                   manos_jugadas = manos_jugadas + 1,
+                   manos_ganadas = manos_ganadas + excluded.manos_ganadas,
+                   manos_perdidas = manos_perdidas + excluded.manos_perdidas,
+                   fichas_netas = fichas_netas + excluded.fichas_netas""",
+            (sesion, nombre, momento, momento, ganadas, perdidas, variacion))
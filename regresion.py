@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import random
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import app
+
+# --- Modo de Regresión: Repetición Determinista de Rondas ---
+# Repite rondas con semilla fija y un guion de acciones del jugador humano, directamente sobre
+# PokerGame (sin servidor ni peticiones HTTP), y compara el resultado final con una referencia.
+# Sirve como red de seguridad al refactorizar el evaluador, la baraja o la CPU.
+#
+# Archivo de casos (JSON Lines), un caso por línea:
+#   {"id": "c1", "semilla": 42, "acciones": [["apostar", 20], ["igualar", 0]],
+#    "esperado": {"fichas_jugador": 980, "fichas_cpu": 1020, "bote": 0, "ganador": "CPU", "estado": "ronda_finalizada"}}
+#
+# Uso (sin archivo se usa casos_regresion.jsonl, la referencia incluida en el repositorio):
+#   python regresion.py [casos.jsonl]                  Compara con los resultados esperados
+#   python regresion.py [casos.jsonl] --generar        Reescribe los resultados esperados
+#   python regresion.py [casos.jsonl] --crear 5000     Crea 5000 casos aleatorios con su referencia
+
+FASES_APUESTAS = ["pre_flop_apuestas", "flop_apuestas", "turn_apuestas", "river_apuestas"]
+ESTADOS_FINALES = ["showdown", "ronda_finalizada", "ronda_terminada_por_retiro"]
+MAX_PASOS = 1000 # Límite de seguridad por ronda
+CASOS_POR_DEFECTO = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'casos_regresion.jsonl')
+# Incluye apuestas de todas las fichas (all-in) y acciones que a veces no son válidas
+ACCIONES_ALEATORIAS = [("apostar", 20), ("apostar", 50), ("apostar", 1000), ("igualar", 0), ("subir", 10),
+                       ("subir", 40), ("subir", 500), ("pasar", 0), ("retirarse", 0)]
+
+
+def reproducir_caso(caso, elegir_accion=None):
+    """
+    Repite una ronda siguiendo el mismo flujo que las rutas de Flask:
+    la CPU actúa en su turno, el jugador humano toma la siguiente acción del guion
+    y, cuando la ronda de apuestas termina, se avanza de fase.
+    La ronda acaba al resolverse o cuando el guion se queda sin acciones. Si se pasa
+    elegir_accion, se llama para obtener más acciones cuando el guion se agota, y cada
+    acción elegida se añade a caso['acciones'].
+    Devuelve el resultado final de la ronda.
+    """
+    juego = app.PokerGame(caso.get('nombre', "Jugador"))
+    juego.iniciar_ronda(caso['semilla'])
+    acciones = list(caso.get('acciones', []))
+
+    for _ in range(MAX_PASOS):
+        if juego.estado_juego in ESTADOS_FINALES:
+            break
+        if juego.es_turno_cpu() and juego.estado_juego in FASES_APUESTAS:
+            juego._ejecutar_turno_cpu()
+        elif juego.es_turno_jugador_humano() and juego.estado_juego in FASES_APUESTAS:
+            if not acciones:
+                if elegir_accion is None:
+                    break # Guion agotado
+                accion_elegida = list(elegir_accion())
+                caso.setdefault('acciones', []).append(accion_elegida)
+                acciones.append(accion_elegida)
+            accion, cantidad = acciones.pop(0)
+            juego.manejar_accion_jugador(accion, cantidad)
+        elif juego._verificar_fin_ronda_apuestas() and juego.estado_juego not in ESTADOS_FINALES:
+            juego.avanzar_fase_juego() # Igual que la ruta /avanzar_fase
+        else:
+            break
+
+    return {
+        'fichas_jugador': juego.jugador.fichas,
+        'fichas_cpu': juego.maquina.fichas,
+        'bote': juego.mesa.bote,
+        'ganador': juego.ganador_ronda.nombre if juego.ganador_ronda else None,
+        'estado': juego.estado_juego,
+    }
+
+
+def reproducir_casos(casos, procesos=None):
+    """Repite todos los casos en paralelo y devuelve sus resultados en el mismo orden."""
+    casos = list(casos)
+    procesos = procesos or os.cpu_count() or 1
+    if procesos == 1:
+        return [reproducir_caso(caso) for caso in casos]
+    # Trozos grandes para que el coste de enviar cada caso al proceso sea despreciable
+    tam_trozo = max(1, len(casos) // (procesos * 4))
+    with ProcessPoolExecutor(max_workers=procesos) as ejecutor:
+        return list(ejecutor.map(reproducir_caso, casos, chunksize=tam_trozo))
+
+
+def generar_casos_aleatorios(num_casos, semilla=0):
+    """
+    Crea casos con semillas y guiones de acciones aleatorios (incluye acciones inválidas).
+    Cada guion se construye jugando la ronda y añadiendo acciones hasta que termina, para
+    que todos los casos comprueben el reparto final del bote.
+    """
+    generador = random.Random(semilla) # Independiente del random global que usa el juego
+    casos = []
+    for i in range(num_casos):
+        caso = {'id': f"aleatorio-{i}", 'semilla': generador.randrange(2 ** 31), 'acciones': []}
+        reproducir_caso(caso, lambda: generador.choice(ACCIONES_ALEATORIAS))
+        casos.append(caso)
+    return casos
+
+
+def leer_casos(ruta):
+    """Lee un archivo de casos en formato JSON Lines."""
+    with open(ruta, encoding='utf-8') as f:
+        return [json.loads(linea) for linea in f if linea.strip()]
+
+
+def escribir_casos(ruta, casos):
+    """Escribe un archivo de casos en formato JSON Lines."""
+    with open(ruta, 'w', encoding='utf-8') as f:
+        for caso in casos:
+            f.write(json.dumps(caso, ensure_ascii=False) + "\n")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Regresión determinista de rondas de póker con semilla.")
+    parser.add_argument('casos', nargs='?', default=CASOS_POR_DEFECTO,
+                        help="Archivo JSON Lines con los casos (por defecto, casos_regresion.jsonl)")
+    parser.add_argument('--generar', action='store_true', help="Reescribe los resultados esperados con los actuales")
+    parser.add_argument('--crear', type=int, metavar='N', help="Crea N casos aleatorios (sobrescribe el archivo)")
+    parser.add_argument('--procesos', type=int, help="Número de procesos (por defecto, uno por CPU)")
+    args = parser.parse_args(argv)
+
+    casos = generar_casos_aleatorios(args.crear) if args.crear else leer_casos(args.casos)
+    resultados = reproducir_casos(casos, args.procesos)
+
+    if args.generar or args.crear:
+        for caso, resultado in zip(casos, resultados):
+            caso['esperado'] = resultado
+        escribir_casos(args.casos, casos)
+        print(f"Se guardaron {len(casos)} casos con sus resultados esperados en {args.casos}.")
+        return 0
+
+    fallos = sin_referencia = 0
+    for numero, (caso, resultado) in enumerate(zip(casos, resultados), start=1):
+        esperado = caso.get('esperado')
+        if esperado is None:
+            sin_referencia += 1
+        elif esperado != resultado:
+            fallos += 1
+            print(f"FALLO {caso.get('id', numero)} (semilla {caso['semilla']}):")
+            for clave in sorted(set(esperado) | set(resultado)):
+                if esperado.get(clave) != resultado.get(clave):
+                    print(f"  {clave}: esperado {esperado.get(clave)!r}, obtenido {resultado.get(clave)!r}")
+
+    print(f"{len(casos)} casos: {len(casos) - fallos - sin_referencia} correctos, {fallos} fallos, "
+          f"{sin_referencia} sin resultado esperado.")
+    return 1 if fallos else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())